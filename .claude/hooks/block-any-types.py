@@ -2,18 +2,21 @@
 """
 PreToolUse hook: Block commits containing explicit `any` types.
 
-Scans staged .ts/.tsx files for TypeScript `any` type usage and blocks
-the commit if any are found. Catches patterns like `: any`, `as any`,
+Scans lines added in staged .ts/.tsx files for TypeScript `any` type usage
+and blocks the commit if any are found. Catches patterns like `: any`, `as any`,
 `<any>`, and `any[]`.
 
 Exit 2 = block the tool call.
 """
+import ast
 import json
 import os
 import re
 import subprocess
 import sys
 
+from hook_utils import parse_bash_event
+
 try:
     input_data = json.load(sys.stdin)
 except json.JSONDecodeError:
@@ -23,29 +26,11 @@ if input_data.get("tool_name") != "Bash":
     sys.exit(0)
 
 command = input_data.get("tool_input", {}).get("command", "")
-if not command or "git commit" not in command:
+if not command or not parse_bash_event(command).is_commit:
     sys.exit(0)
 
 project_dir = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
 
-try:
-    result = subprocess.run(
-        ["git", "diff", "--cached", "--name-only", "--diff-filter=ACMR"],
-        capture_output=True,
-        text=True,
-        cwd=project_dir,
-    )
-    staged_files = [
-        f
-        for f in result.stdout.strip().splitlines()
-        if f.endswith((".ts", ".tsx")) and not f.endswith(".d.ts")
-    ]
-except Exception:
-    sys.exit(0)
-
-if not staged_files:
-    sys.exit(0)
-
 # Patterns that indicate explicit `any` usage
 ANY_PATTERN = re.compile(
     r"""
@@ -60,31 +45,77 @@ ANY_PATTERN = re.compile(
 )
 
 COMMENT_LINE = re.compile(r"^\s*(?://|/?\*|\*)")
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)")
 
-violations = []
+# POSIX ERE superset of ANY_PATTERN for git's -G filter (no \b: not portable).
+# git drops files whose changes cannot match before any output reaches Python;
+# ANY_PATTERN still makes the final call on each added line.
+GIT_ANY_FILTER = r":[[:space:]]*any|as[[:space:]]+any|<any|any[[:space:]]*[[|]|\|[[:space:]]*any"
 
-for filepath in staged_files:
-    abs_path = os.path.join(project_dir, filepath)
-    if not os.path.isfile(abs_path):
-        continue
 
-    try:
-        staged_content = subprocess.run(
-            ["git", "show", f":{filepath}"],
-            capture_output=True,
-            text=True,
-            cwd=project_dir,
-        )
-        lines = staged_content.stdout.splitlines()
-    except Exception:
+def unquote_path(path):
+    """Undo git's C-style quoting of unusual paths ("b/a\\tb.ts" -> b/a<TAB>b.ts)."""
+    if path.startswith('"'):
+        return ast.literal_eval("b" + path).decode("utf-8", "replace")
+    return path
+
+
+# One zero-context diff of the whole index: a single git process, and only
+# added lines are scanned instead of every line of every staged file. In the
+# common clean case -G leaves the diff empty and Python scans nothing.
+try:
+    result = subprocess.run(
+        [
+            "git", "diff", "--cached", "--unified=0", "--diff-filter=ACMR",
+            # Pin the output format: diff.mnemonicPrefix, diff.noprefix,
+            # color.diff, or an external diff driver would otherwise change it
+            "--src-prefix=a/", "--dst-prefix=b/", "--no-color", "--no-ext-diff",
+            f"-G{GIT_ANY_FILTER}",
+            "--", "*.ts", "*.tsx", ":(exclude)*.d.ts",
+        ],
+        capture_output=True,
+        text=True,
+        cwd=project_dir,
+    )
+except Exception:
+    sys.exit(0)
+
+if result.returncode != 0 or not result.stdout:
+    sys.exit(0)
+
+violations = []
+current_file = None
+in_header = False
+line_num = 0
+
+# split("\n") rather than splitlines(): added lines may contain \r or other
+# characters splitlines() treats as line breaks
+for line in result.stdout.split("\n"):
+    if line.startswith("diff --git "):
+        current_file = None
+        in_header = True
+        continue
+    if in_header:
+        # The post-image path; taken from here rather than the "diff --git"
+        # line because it is unambiguous even when the path contains spaces
+        # (git terminates such paths with a tab)
+        if line.startswith("+++ "):
+            path = unquote_path(line[4:].rstrip("\t"))
+            current_file = path[2:] if path.startswith("b/") else None
+        elif line.startswith("@@"):
+            in_header = False
+    if line.startswith("@@"):
+        hunk = HUNK_HEADER.match(line)
+        line_num = int(hunk.group(1)) if hunk else 0
+        continue
+    if in_header or not line.startswith("+"):
         continue
 
-    for line_num, line in enumerate(lines, 1):
-        stripped = line.strip()
-        if COMMENT_LINE.match(stripped):
-            continue
-        if ANY_PATTERN.search(line):
-            violations.append((filepath, line_num, stripped[:120]))
+    added = line[1:]
+    stripped = added.strip()
+    if current_file and not COMMENT_LINE.match(stripped) and ANY_PATTERN.search(added):
+        violations.append((current_file, line_num, stripped[:120]))
+    line_num += 1
 
 if violations:
     print(
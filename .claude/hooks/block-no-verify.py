@@ -6,6 +6,8 @@ Exit 2 = block the tool call.
 import json
 import sys
 
+from hook_utils import parse_bash_event
+
 try:
     input_data = json.load(sys.stdin)
 except json.JSONDecodeError:
@@ -18,7 +20,7 @@ command = input_data.get("tool_input", {}).get("command", "")
 if not command:
     sys.exit(0)
 
-if "git" in command and ("--no-verify" in command or " -n " in command or command.endswith(" -n")):
+if parse_bash_event(command).has_no_verify:
     print("Commit blocked: --no-verify is not allowed. Git hooks enforce code quality.", file=sys.stderr)
     print("", file=sys.stderr)
     print("The pre-commit hook runs:", file=sys.stderr)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Hook dispatcher: run every Python hook for one event in a single interpreter.
+
+Each hook script used to be its own settings.json entry, so every tool call
+paid one python3 cold start per hook. The dispatcher reads the event from
+stdin once and executes each hook script in-process with that payload on
+its stdin. The scripts are unchanged and still runnable on their own.
+
+Usage: dispatch.py <group>   (one of the keys in HOOKS below)
+
+Exit code is the highest of the hook exit codes, so any 2 blocks the call.
+"""
+import io
+import os
+import runpy
+import sys
+import traceback
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Ordered cheapest first: a hook that blocks early can spare the slow ones.
+HOOKS = {
+    "pre-bash": [
+        "block-no-verify.py",
+        "enforce-commit-message.py",
+        "block-any-types.py",
+        "pre-commit-validate.py",
+    ],
+    "pre-write": [
+        "protect-files.py",
+        "enforce-kebab-case.py",
+        "block-barrel-exports.py",
+        "block-test-file-location.py",
+        "block-retro-ui-imports.py",
+        "block-direct-env-access.py",
+        "block-direct-prisma-client.py",
+        "block-dangerous-html.py",
+        "block-console-log.py",
+        "block-deep-package-imports.py",
+    ],
+    "post-bash": [
+        "post-merge-validate.py",
+    ],
+    "post-write": [
+        "enforce-arrow-functions.py",
+        "track-doc-changes.py",
+    ],
+}
+
+# Minutes of pnpm work: not worth running once the call is already blocked
+SKIP_WHEN_BLOCKED = {"pre-commit-validate.py"}
+
+
+def run_hook(script, raw_input):
+    """Execute a hook script as __main__ with raw_input on stdin. Returns its exit code."""
+    path = os.path.join(HOOKS_DIR, script)
+    saved_stdin, saved_argv = sys.stdin, sys.argv
+    sys.stdin = io.StringIO(raw_input)
+    sys.argv = [path]
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        return e.code if isinstance(e.code, int) else 1
+    except Exception:
+        # A crashing hook is a non-blocking error, same as a failed subprocess
+        print(f"Hook {script} crashed:", file=sys.stderr)
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.stdin, sys.argv = saved_stdin, saved_argv
+    return 0
+
+
+def main():
+    if len(sys.argv) != 2 or sys.argv[1] not in HOOKS:
+        print(f"Usage: dispatch.py <{'|'.join(HOOKS)}>", file=sys.stderr)
+        return 1
+
+    raw_input = sys.stdin.read()
+    exit_code = 0
+    for script in HOOKS[sys.argv[1]]:
+        if exit_code == 2 and script in SKIP_WHEN_BLOCKED:
+            continue
+        exit_code = max(exit_code, run_hook(script, raw_input))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
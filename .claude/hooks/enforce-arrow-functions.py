@@ -6,6 +6,7 @@ Checks written/edited TypeScript files for `function` keyword and warns.
 Non-blocking: always exits 0.
 """
 import json
+import mmap
 import os
 import re
 import sys
@@ -39,30 +40,41 @@ skip_patterns = [
 if any(pat in basename for pat in skip_patterns):
     sys.exit(0)
 
-try:
-    with open(file_path, "r") as f:
-        lines = f.readlines()
-except Exception:
-    sys.exit(0)
-
-func_pattern = re.compile(
-    r"^[\s]*(export\s+)?(export\s+default\s+)?(async\s+)?function\s+\w+",
+# Anchored at line start, so comment lines can never match.
+# [ \t] rather than \s keeps each match within a single line.
+# Bytes pattern: runs directly over the mmap without decoding the file.
+FUNC_PATTERN = re.compile(
+    rb"^[ \t]*(?:export[ \t]+)?(?:export[ \t]+default[ \t]+)?(?:async[ \t]+)?function[ \t]+\w+",
+    re.MULTILINE,
 )
 
+# Only the first 5 are printed; a 6th is enough to know there are "more"
+MAX_REPORTED = 5
+
 violations = []
-for i, line in enumerate(lines, 1):
-    stripped = line.strip()
-    if stripped.startswith("//") or stripped.startswith("*") or stripped.startswith("/*"):
-        continue
-    if func_pattern.match(line):
-        violations.append((i, stripped[:80]))
+try:
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        line_num = 1
+        scanned = 0
+        for match in FUNC_PATTERN.finditer(mm):
+            # Matches start at a line start; count newlines since the last one
+            line_num += mm[scanned:match.start()].count(b"\n")
+            scanned = match.start()
+            line_end = mm.find(b"\n", scanned)
+            line = mm[scanned:line_end if line_end != -1 else len(mm)]
+            violations.append((line_num, line.decode("utf-8", "replace").strip()[:80]))
+            if len(violations) > MAX_REPORTED:
+                break
+except (OSError, ValueError):
+    # ValueError: mmap cannot map an empty file
+    sys.exit(0)
 
 if violations:
     print(f"Arrow function style: {basename}:", file=sys.stderr)
-    for line_num, text in violations[:5]:
+    for line_num, text in violations[:MAX_REPORTED]:
         print(f"  Line {line_num}: {text}", file=sys.stderr)
-    if len(violations) > 5:
-        print(f"  ... and {len(violations) - 5} more", file=sys.stderr)
+    if len(violations) > MAX_REPORTED:
+        print("  ... and more", file=sys.stderr)
     print("  Prefer: const foo = () => { ... }", file=sys.stderr)
 
 sys.exit(0)
@@ -12,6 +12,8 @@ import json
 import re
 import sys
 
+from hook_utils import parse_bash_event
+
 try:
     input_data = json.load(sys.stdin)
 except json.JSONDecodeError:
@@ -21,19 +23,14 @@ if input_data.get("tool_name") != "Bash":
     sys.exit(0)
 
 command = input_data.get("tool_input", {}).get("command", "")
-if not command or "git commit" not in command:
+if not command:
+    sys.exit(0)
+
+bash = parse_bash_event(command)
+if not bash.is_commit or bash.message is None:
     sys.exit(0)
 
-# Extract commit message — try heredoc pattern first (most common in Claude Code)
-heredoc_match = re.search(r"cat\s+<<['\"]?EOF['\"]?\)?\n(.+?)\n\s*EOF", command, re.DOTALL)
-if heredoc_match:
-    msg = heredoc_match.group(1).strip()
-else:
-    # Fall back to simple -m flag
-    msg_match = re.search(r'-m\s+["\'](.+?)["\']', command, re.DOTALL)
-    if not msg_match:
-        sys.exit(0)
-    msg = msg_match.group(1).strip()
+msg = bash.message
 
 first_line = msg.split("\n")[0].strip()
 
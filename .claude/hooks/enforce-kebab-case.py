@@ -12,6 +12,11 @@ import os
 import re
 import sys
 
+ALLOWED_NAMES = {"README", "LICENSE", "CHANGELOG", "CONTRIBUTING", "CLAUDE", "SKILL"}
+
+# Kebab-case: lowercase letters, numbers, hyphens
+KEBAB_RE = re.compile(r"^[a-z][a-z0-9]*(-[a-z0-9]+)*$")
+
 try:
     input_data = json.load(sys.stdin)
 except json.JSONDecodeError:
@@ -29,41 +34,31 @@ if not file_path:
 if "AI_RESEARCH" in file_path.split(os.sep):
     sys.exit(0)
 
-# Ignore CLAUDE.md files
 filename = os.path.basename(file_path)
-if filename == "CLAUDE.md":
+
+# Exceptions, cheapest and most common first so they never reach a regex:
+# dotfiles (.gitignore, .env), __root / __root__ style names, well-known
+# upper-case docs, and ALL_CAPS names (CLAUDE.md, SKILL.md, ...)
+if filename.startswith((".", "__")):
     sys.exit(0)
 
 name_without_ext = os.path.splitext(filename)[0]
 
-# Exception patterns
-ALLOWED_PATTERNS = [
-    r"^__.*__$",        # __root__, __index__
-    r"^__.*$",          # __root, __init
-    r"^\..*$",          # .gitignore, .env
-    r"^README$",        # README files
-    r"^LICENSE$",
-    r"^CHANGELOG$",
-    r"^CONTRIBUTING$",
-    r"^CLAUDE$",        # CLAUDE.md
-    r"^SKILL$",         # SKILL.md
-    r"^[A-Z_]+$",       # ALL_CAPS files
-]
-
-for pattern in ALLOWED_PATTERNS:
-    if re.match(pattern, name_without_ext):
-        sys.exit(0)
+if name_without_ext in ALLOWED_NAMES:
+    sys.exit(0)
 
-# Kebab-case: lowercase letters, numbers, hyphens
-kebab_case_pattern = r"^[a-z][a-z0-9]*(-[a-z0-9]+)*$"
+# Same set as ^[A-Z_]+$, underscore-only names (_, ___) included
+caps = name_without_ext.replace("_", "")
+if not caps or (caps.isupper() and caps.isalpha() and caps.isascii()):
+    sys.exit(0)
 
 # Allow dot notation (e.g., vitest.config.ts) if each segment is kebab-case
 if "." in name_without_ext:
     segments = name_without_ext.split(".")
-    if all(re.match(kebab_case_pattern, seg) for seg in segments):
+    if all(KEBAB_RE.match(seg) for seg in segments):
         sys.exit(0)
 
-if not re.match(kebab_case_pattern, name_without_ext):
+if not KEBAB_RE.match(name_without_ext):
     has_uppercase = any(c.isupper() for c in name_without_ext)
 
     print(f"File name '{filename}' does not follow kebab-case naming convention.", file=sys.stderr)
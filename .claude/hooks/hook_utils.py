@@ -0,0 +1,346 @@
+"""
+Shared helpers for the Bash hooks.
+
+Classifies a Bash command once so that block-no-verify, enforce-commit-message,
+block-any-types, pre-commit-validate, and post-merge-validate do not each
+re-scan the same command string. Results are cached per command, so when the
+hooks run in one interpreter (dispatch.py) the parse happens exactly once.
+
+Also maps staged paths to their owning workspace packages so the validate
+hooks can scope pnpm/turbo runs to what actually changed, and builds and runs
+the checks those hooks share.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shlex
+import subprocess
+from dataclasses import dataclass
+from functools import lru_cache
+
+# A command like `git add -A && git commit` or `git commit -a` stages files
+# after the PreToolUse hooks run, so the index is not final yet. The same
+# holds for `git commit <paths>` and -i/-o/-p; _parse_commit detects those.
+STAGES_IN_COMMAND = re.compile(r"\bgit\s+add\b|\bgit\s+commit\b.*\s(?:-[A-Za-z]*a[A-Za-z]*|--all)\b")
+
+# Heredoc message body, e.g. -m "$(cat <<'EOF' ... EOF)" (most common in Claude Code)
+HEREDOC_MESSAGE = re.compile(r"cat\s+<<['\"]?EOF['\"]?\)?\n(.+?)\n\s*EOF", re.DOTALL)
+# Last-resort -m extraction when the command cannot be tokenized
+FLAG_MESSAGE = re.compile(r'-m\s+["\'](.+?)["\']', re.DOTALL)
+SHELL_PUNCTUATION = set("();<>|&")
+# Short commit flags that take a value: the rest of the flag cluster, or the
+# next argument when the flag ends the cluster (-m, -F, -C, -c, -t)
+SHORT_VALUE_FLAGS = set("mFCct")
+# Short commit flags whose optional value can only be attached (-uno, -S<key>)
+SHORT_ATTACHED_VALUE_FLAGS = set("uS")
+# Long commit options that take the next argument as their value
+LONG_VALUE_OPTIONS = {
+    "--author", "--date", "--template", "--cleanup", "--trailer", "--fixup",
+    "--squash", "--reuse-message", "--reedit-message", "--pathspec-from-file",
+}
+# Commit flags that take content from the working tree rather than the index:
+# --include/--only (also -i/-o), --patch (-p), --interactive, --pathspec-from-file
+WORKTREE_SHORT_FLAGS = set("iop")
+WORKTREE_OPTIONS = {"--include", "--only", "--patch", "--interactive", "--pathspec-from-file"}
+
+# Files that can affect typecheck, lint, or build output
+CODE_EXTS = (".ts", ".tsx", ".mts", ".cts", ".js", ".jsx", ".mjs", ".cjs", ".json", ".css")
+CONFIG_FILES = {"pnpm-lock.yaml", "pnpm-workspace.yaml"}
+
+# typecheck and build are Turbo tasks: one `turbo run` schedules them together
+# and serves unchanged packages from its content-hash cache. lint is a plain
+# root-level biome run, so it stays a separate check.
+TURBO_CHECK = "turbo"
+TURBO_LOG_LINE = re.compile(r"^([\w@/.-]+):(typecheck|build): ?(.*)$")
+
+# Green validate runs are remembered as <key>.ok markers; older ones are evicted
+CACHE_LIMIT = 50
+
+# Root files that affect every workspace package
+WORKSPACE_ROOT_FILES = {
+    "package.json",
+    "pnpm-lock.yaml",
+    "pnpm-workspace.yaml",
+    "tsconfig.base.json",
+    "turbo.json",
+    "biome.json",
+}
+
+
+@dataclass(frozen=True)
+class BashInfo:
+    """What the hooks need to know about a Bash command."""
+
+    is_git: bool
+    is_commit: bool
+    is_merge: bool
+    has_no_verify: bool
+    allow_empty: bool
+    stages_files: bool
+    message: str | None
+
+
+def _read_message_file(path: str) -> str | None:
+    """Contents of a `git commit -F` file; None for stdin or unreadable files."""
+    if path in ("", "-"):
+        return None
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _short_flags(token: str) -> tuple[str, str]:
+    """Split a short flag cluster into its plain flags and the value-taking flag that ends it, if any."""
+    for i, flag in enumerate(token[1:], 1):
+        if flag in SHORT_VALUE_FLAGS or flag in SHORT_ATTACHED_VALUE_FLAGS:
+            return token[1:i], token[i:]
+    return token[1:], ""
+
+
+def _parse_commit(command: str) -> tuple[str | None, bool]:
+    """Parse the `git commit` in a command.
+
+    Returns the inline message, and whether the commit takes content from the
+    working tree instead of the index (pathspec arguments, -i/-o/-p, ...).
+
+    Tokenizes with shlex so quoting, -m/--message/-F/--file in any order,
+    repeated -m (joined as paragraphs), and combined flags like -am all work.
+    The message is None when git will open an editor or read it from stdin.
+    """
+    lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+    lexer.whitespace_split = True
+    try:
+        tokens = list(lexer)
+    except ValueError:
+        # Unbalanced quotes: fall back to a plain regex scan, and since the
+        # arguments are unknown, do not assume the index is what gets committed
+        match = HEREDOC_MESSAGE.search(command) or FLAG_MESSAGE.search(command)
+        return (match.group(1).strip() if match else None), True
+
+    start = next(
+        (i for i in range(1, len(tokens)) if tokens[i] == "commit" and tokens[i - 1] == "git"),
+        None,
+    )
+    if start is None:
+        return None, False
+
+    parts = []
+    message_unknown = False
+    from_worktree = False
+    end_of_options = False
+    args = iter(tokens[start + 1:])
+    for token in args:
+        # An empty token is a quoted "" argument, not shell punctuation
+        if token and set(token) <= SHELL_PUNCTUATION:
+            break  # end of the git commit invocation
+        if end_of_options or not token.startswith("-") or token == "-":
+            from_worktree = True  # a pathspec
+            continue
+        if token == "--":
+            end_of_options = True
+            continue
+
+        # kind is "m" for a message value, "f" for a message file path
+        kind = value = None
+        if token.startswith("--"):
+            option, has_value, value = token.partition("=")
+            if option in WORKTREE_OPTIONS:
+                from_worktree = True
+            if option in ("--message", "--file"):
+                kind = option[2]
+            if not has_value and (kind or option in LONG_VALUE_OPTIONS):
+                value = next(args, "")
+        else:
+            flags, valued = _short_flags(token)
+            if WORKTREE_SHORT_FLAGS & set(flags):
+                from_worktree = True
+            if valued and valued[0] in SHORT_VALUE_FLAGS:
+                value = valued[1:] or next(args, "")
+                kind = valued[0].lower() if valued[0] in "mF" else None
+
+        if kind == "m":
+            parts.append(value)
+        elif kind == "f":
+            content = _read_message_file(value)
+            if content is None:
+                message_unknown = True
+            else:
+                parts.append(content)
+
+    if message_unknown:
+        return None, from_worktree
+
+    if not parts:
+        match = HEREDOC_MESSAGE.search(command)
+        return (match.group(1).strip() if match else None), from_worktree
+
+    messages = []
+    for part in parts:
+        heredoc = HEREDOC_MESSAGE.search(part)
+        messages.append((heredoc.group(1) if heredoc else part).strip())
+    return "\n\n".join(messages), from_worktree
+
+
+@lru_cache(maxsize=8)
+def parse_bash_event(command: str) -> BashInfo:
+    """Classify a Bash command string."""
+    is_git = "git" in command
+    is_commit = "git commit" in command
+
+    message, from_worktree = _parse_commit(command) if is_commit else (None, False)
+
+    return BashInfo(
+        is_git=is_git,
+        is_commit=is_commit,
+        is_merge="git merge" in command,
+        has_no_verify=is_git
+        and ("--no-verify" in command or " -n " in command or command.endswith(" -n")),
+        allow_empty="--allow-empty" in command,
+        stages_files=from_worktree or bool(STAGES_IN_COMMAND.search(command)),
+        message=message,
+    )
+
+
+@lru_cache(maxsize=4)
+def get_staged_files(project_dir: str) -> list[str] | None:
+    """Every path the staged commit touches, deletions included, or None if git failed.
+
+    Deleting a module breaks its importers just like editing it does, and a
+    rename is listed as its old and new path so both owning packages count.
+    """
+    try:
+        # NUL-delimited: paths arrive verbatim, with no quoting of unusual names
+        result = subprocess.run(
+            ["git", "diff", "--cached", "--name-only", "-z", "--no-renames"],
+            capture_output=True,
+            cwd=project_dir,
+        )
+    except Exception:
+        return None
+    if result.returncode != 0:
+        return None
+    return [p.decode("utf-8", "replace") for p in result.stdout.split(b"\x00") if p]
+
+
+def is_code_file(path: str) -> bool:
+    """Whether a changed path can affect typecheck, lint, or build."""
+    return path.endswith(CODE_EXTS) or os.path.basename(path) in CONFIG_FILES
+
+
+@lru_cache(maxsize=None)
+def _owning_package(project_dir: str, directory: str) -> str | None:
+    """Name of the nearest workspace package at or above a repo-relative directory."""
+    while directory:
+        manifest = os.path.join(project_dir, directory, "package.json")
+        if os.path.isfile(manifest):
+            try:
+                with open(manifest) as f:
+                    return json.load(f).get("name")
+            except (OSError, ValueError):
+                return None
+        directory = os.path.dirname(directory)
+    return None
+
+
+def affected_packages(files: list[str], project_dir: str) -> list[str] | None:
+    """Workspace packages owning the given repo-relative files.
+
+    Returns None when the whole workspace is affected: a root config file
+    changed, or a file belongs to no workspace package.
+    """
+    packages = set()
+    for path in files:
+        if path in WORKSPACE_ROOT_FILES:
+            return None
+        name = _owning_package(project_dir, os.path.dirname(path))
+        if name is None:
+            return None
+        packages.add(name)
+    return sorted(packages)
+
+
+def validation_checks(project_dir: str, filters: list[str]) -> list[tuple[str, list[str]]]:
+    """(name, command) of the typecheck, lint, and build checks, scoped by --filter flags."""
+    if os.path.isfile(os.path.join(project_dir, "turbo.json")):
+        return [
+            (
+                TURBO_CHECK,
+                ["pnpm", "turbo", "run", "typecheck", "build", *filters, "--output-logs=errors-only", "--no-color"],
+            ),
+            ("lint", ["pnpm", "lint"]),
+        ]
+    return [
+        ("typecheck", ["pnpm", *filters, "typecheck"]),
+        ("lint", ["pnpm", "lint"]),
+        ("build", ["pnpm", *filters, "build"]),
+    ]
+
+
+def split_turbo_failures(output: str) -> list[tuple[str, str]]:
+    """Group turbo's errors-only log lines by their package#task prefix."""
+    tasks: dict[str, list[str]] = {}
+    for line in output.splitlines():
+        match = TURBO_LOG_LINE.match(line)
+        if match:
+            tasks.setdefault(f"{match.group(1)}#{match.group(2)}", []).append(match.group(3))
+    return [(task, "\n".join(lines).strip()) for task, lines in tasks.items()]
+
+
+def run_check(name: str, cmd: list[str], project_dir: str, timeout: int) -> list[tuple[str, str]]:
+    """Run a single check and return a list of (name, error) failures."""
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            cwd=project_dir,
+        )
+    except subprocess.TimeoutExpired:
+        return [(name, f"timed out after {timeout}s")]
+    except FileNotFoundError:
+        return [(name, f"command not found: {cmd[0]}")]
+    if result.returncode == 0:
+        return []
+    if name == TURBO_CHECK:
+        task_failures = split_turbo_failures(result.stdout)
+        if task_failures:
+            return task_failures
+    return [(name, result.stderr.strip() or result.stdout.strip())]
+
+
+def cache_key(tree_sha: str, checks: list[tuple[str, list[str]]]) -> str:
+    """Pass-marker key for a tree validated by exactly these check commands.
+
+    The same tree validated with a narrower --filter set, or without a
+    check, must not vouch for a wider run.
+    """
+    checks_hash = hashlib.sha1(json.dumps(checks).encode()).hexdigest()[:16]
+    return f"{tree_sha}-{checks_hash}"
+
+
+def cache_hit(cache_dir: str, key: str) -> bool:
+    """Whether a run with this key already passed."""
+    return os.path.exists(os.path.join(cache_dir, f"{key}.ok"))
+
+
+def record_pass(cache_dir: str, key: str) -> None:
+    """Write the pass marker for a key and keep only the newest CACHE_LIMIT markers."""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(os.path.join(cache_dir, f"{key}.ok"), "w") as f:
+            f.write("ok")
+        entries = sorted(
+            (os.path.join(cache_dir, name) for name in os.listdir(cache_dir)),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        for stale in entries[CACHE_LIMIT:]:
+            os.remove(stale)
+    except OSError:
+        pass
@@ -8,6 +8,18 @@ import json
 import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from hook_utils import (
+    affected_packages,
+    cache_hit,
+    cache_key,
+    is_code_file,
+    parse_bash_event,
+    record_pass,
+    run_check,
+    validation_checks,
+)
 
 try:
     input_data = json.load(sys.stdin)
@@ -18,7 +30,7 @@ if input_data.get("tool_name") != "Bash":
     sys.exit(0)
 
 command = input_data.get("tool_input", {}).get("command", "")
-if not command or "git merge" not in command:
+if not command or not parse_bash_event(command).is_merge:
     sys.exit(0)
 
 tool_output = input_data.get("tool_output", {})
@@ -31,30 +43,60 @@ if "Already up to date" in stdout:
     sys.exit(0)
 
 project_dir = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
+CHECK_TIMEOUT = 120
+
+# Only validate when the merge brought in files that can affect the checks,
+# and only for the packages it touched (plus their dependents)
+try:
+    result = subprocess.run(
+        ["git", "diff", "--name-only", "-z", "HEAD@{1}", "HEAD"],
+        capture_output=True,
+        cwd=project_dir,
+    )
+    merged_files = (
+        [p.decode("utf-8", "replace") for p in result.stdout.split(b"\x00") if p]
+        if result.returncode == 0
+        else None
+    )
+except FileNotFoundError:
+    merged_files = None
+
+packages = None
+if merged_files is not None:
+    code_files = [f for f in merged_files if is_code_file(f)]
+    if not code_files:
+        sys.exit(0)
+    packages = affected_packages(code_files, project_dir)
+
+filters = [f"--filter=...{pkg}" for pkg in packages] if packages else []
+
+checks = validation_checks(project_dir, filters)
+
+# Successful runs are recorded by merged-tree hash so that re-merging an
+# already-validated tree (e.g. after a reset and retry) skips the checks. The
+# key also covers the exact commands.
+CACHE_DIR = os.path.join(project_dir, ".claude", ".cache", "postmerge")
+
+try:
+    tree_sha = subprocess.check_output(
+        ["git", "rev-parse", "HEAD^{tree}"], text=True, cwd=project_dir, stderr=subprocess.DEVNULL
+    ).strip()
+except (subprocess.CalledProcessError, FileNotFoundError):
+    tree_sha = None
+
+key = cache_key(tree_sha, checks) if tree_sha else None
+if key and cache_hit(CACHE_DIR, key):
+    sys.exit(0)
+
+
+# Checks are independent, so run them concurrently: wall time is the
+# slowest check rather than the sum of all of them.
+with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+    futures = {executor.submit(run_check, name, cmd, project_dir, CHECK_TIMEOUT): name for name, cmd in checks}
+    results = {futures[future]: future.result() for future in as_completed(futures)}
 
-checks = [
-    ("type-check", ["pnpm", "type-check"]),
-    ("lint", ["pnpm", "lint"]),
-    ("build", ["pnpm", "build"]),
-]
-
-failed = []
-
-for name, cmd in checks:
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=120,
-            cwd=project_dir,
-        )
-        if result.returncode != 0:
-            failed.append((name, result.stderr.strip() or result.stdout.strip()))
-    except subprocess.TimeoutExpired:
-        failed.append((name, "timed out after 120s"))
-    except FileNotFoundError:
-        failed.append((name, f"command not found: {cmd[0]}"))
+# Report in declaration order, not completion order
+failed = [failure for name, _ in checks for failure in results[name]]
 
 if failed:
     print(
@@ -70,5 +112,7 @@ if failed:
         "Consider reverting (git revert -m 1 HEAD) or fixing issues before continuing.",
         file=sys.stderr,
     )
+elif key:
+    record_pass(CACHE_DIR, key)
 
 sys.exit(0)
@@ -3,12 +3,27 @@
 PreToolUse hook: Block git commits if type-check, lint, or build fail.
 
 Full quality gate: runs pnpm type-check, lint, and build before allowing commit.
+Skipped when no code or workspace config files are staged (e.g. docs-only commits).
 Exit 2 = block the tool call.
 """
 import json
 import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from hook_utils import (
+    TURBO_CHECK,
+    affected_packages,
+    cache_hit,
+    cache_key,
+    get_staged_files,
+    is_code_file,
+    parse_bash_event,
+    record_pass,
+    run_check,
+    validation_checks,
+)
 
 try:
     input_data = json.load(sys.stdin)
@@ -19,38 +34,90 @@ if input_data.get("tool_name") != "Bash":
     sys.exit(0)
 
 command = input_data.get("tool_input", {}).get("command", "")
-if not command or "git commit" not in command:
+if not command:
     sys.exit(0)
 
-if "--allow-empty" in command:
+bash = parse_bash_event(command)
+if not bash.is_commit or bash.allow_empty:
     sys.exit(0)
 
 project_dir = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
+CHECK_TIMEOUT = 300
+
+# When the command stages files itself, or commits paths straight from the
+# working tree, the index is not what gets committed and cannot be trusted
+# to skip checks
+staged_files = None if bash.stages_files else get_staged_files(project_dir)
+
+if staged_files is not None:
+    code_files = [f for f in staged_files if is_code_file(f)]
+    if not code_files:
+        sys.exit(0)
+    has_ts = any(f.endswith((".ts", ".tsx")) for f in code_files)
+    packages = affected_packages(code_files, project_dir)
+else:
+    has_ts = True
+    packages = None
+
+# Limit typecheck/build to the touched packages plus everything that depends
+# on them (the `...` prefix); None means the whole workspace is affected.
+filters = [f"--filter=...{pkg}" for pkg in packages] if packages else []
 
-checks = [
-    ("typecheck", ["pnpm", "typecheck"]),
-    ("lint", ["pnpm", "lint"]),
-    ("build", ["pnpm", "build"]),
-    ("coverage-gate", ["pnpm", "test:coverage-gate"]),
-]
+checks = validation_checks(project_dir, filters)
+# The coverage gate only inspects staged .ts/.tsx files
+if has_ts:
+    checks.append(("coverage-gate", ["pnpm", "test:coverage-gate"]))
 
-failed = []
+# Successful runs are recorded by staged-tree hash so that amends, aborted
+# commits, and retries of an already-validated index skip the checks. The
+# key also covers the exact commands, coverage gate included.
+CACHE_DIR = os.path.join(project_dir, ".claude", ".cache", "precommit")
 
-for name, cmd in checks:
+tree_sha = None
+if staged_files is not None:
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=300,
-            cwd=project_dir,
-        )
-        if result.returncode != 0:
-            failed.append((name, result.stderr.strip() or result.stdout.strip()))
-    except subprocess.TimeoutExpired:
-        failed.append((name, "timed out after 120s"))
-    except FileNotFoundError:
-        failed.append((name, f"command not found: {cmd[0]}"))
+        tree_sha = subprocess.check_output(
+            ["git", "write-tree"], text=True, cwd=project_dir, stderr=subprocess.DEVNULL
+        ).strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        pass
+
+key = cache_key(tree_sha, checks) if tree_sha else None
+if key and cache_hit(CACHE_DIR, key):
+    sys.exit(0)
+
+
+# Workspace packages resolve to their dist/ output, which the build rewrites
+# (tsup, or a turbo cache replay). vitest must not import half-written files,
+# so the coverage gate waits for the build; if the build fails it is skipped,
+# since the commit is blocked either way.
+BUILD_CHECKS = {TURBO_CHECK, "build"}
+AFTER_BUILD = {"coverage-gate"}
+
+
+def run_after(build_future, name, cmd):
+    """Run a check once the build check has finished successfully."""
+    if build_future is not None and build_future.result():
+        return []
+    return run_check(name, cmd, project_dir, CHECK_TIMEOUT)
+
+
+# Other checks are independent, so run them concurrently: wall time is the
+# slowest chain rather than the sum of all of them.
+with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+    futures = {
+        executor.submit(run_check, name, cmd, project_dir, CHECK_TIMEOUT): name
+        for name, cmd in checks
+        if name not in AFTER_BUILD
+    }
+    build_future = next((f for f, name in futures.items() if name in BUILD_CHECKS), None)
+    for name, cmd in checks:
+        if name in AFTER_BUILD:
+            futures[executor.submit(run_after, build_future, name, cmd)] = name
+    results = {futures[future]: future.result() for future in as_completed(futures)}
+
+# Report in declaration order, not completion order
+failed = [failure for name, _ in checks for failure in results[name]]
 
 if failed:
     print("Commit blocked. The following checks failed:\n", file=sys.stderr)
@@ -62,4 +129,7 @@ if failed:
     print("Fix these issues before committing.", file=sys.stderr)
     sys.exit(2)
 
+if key:
+    record_pass(CACHE_DIR, key)
+
 sys.exit(0)
@@ -4,7 +4,8 @@ WorktreeCreate hook: Set up git worktrees for Claude Code.
 
 Replaces default git worktree behavior:
 - Creates worktree with branch worktree/<name>
-- Runs pnpm install in the new worktree
+- Starts pnpm install in the new worktree in the background
+  (.installing -> .ready / .install-failed marker files)
 - Prints absolute worktree path to stdout (required by Claude Code)
 """
 import json
@@ -53,23 +54,34 @@ except subprocess.CalledProcessError as e:
         print(f"Error creating worktree: {e2.stderr.strip()}", file=sys.stderr)
         sys.exit(1)
 
-# Install dependencies
-print(f"Installing dependencies in worktree...", file=sys.stderr)
+# Install dependencies in the background so the worktree path is returned
+# immediately. Progress is signalled by marker files in the worktree root:
+# .installing while running, then .ready or .install-failed (see pnpm-install.log).
+#
+# The worktree shares the parent's lockfile, so every package is normally
+# already in pnpm's content-addressed store: an offline frozen-lockfile install
+# just hardlinks from the store. Only fall back to a networked install when
+# that fails (new or changed dependencies on the branch).
+INSTALL_SCRIPT = (
+    "{ pnpm install --frozen-lockfile --offline || pnpm install; }"
+    " && mv .installing .ready || mv .installing .install-failed"
+)
+
+print("Installing dependencies in worktree (background)...", file=sys.stderr)
+open(os.path.join(worktree_path, ".installing"), "w").close()
 try:
-    subprocess.run(
-        ["pnpm", "install"],
-        check=True,
-        capture_output=True,
-        text=True,
-        cwd=worktree_path,
-        timeout=120,
-    )
-except subprocess.CalledProcessError as e:
-    print(f"Warning: pnpm install failed: {e.stderr.strip()}", file=sys.stderr)
-except FileNotFoundError:
-    print("Warning: pnpm not found — skipping install", file=sys.stderr)
-except subprocess.TimeoutExpired:
-    print("Warning: pnpm install timed out", file=sys.stderr)
+    with open(os.path.join(worktree_path, "pnpm-install.log"), "w") as log:
+        subprocess.Popen(
+            ["sh", "-c", INSTALL_SCRIPT],
+            cwd=worktree_path,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+except OSError as e:
+    os.remove(os.path.join(worktree_path, ".installing"))
+    print(f"Warning: could not start pnpm install: {e}", file=sys.stderr)
 
 # Print absolute path to stdout (required by Claude Code)
 print(os.path.abspath(worktree_path))
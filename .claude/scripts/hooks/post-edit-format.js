@@ -14,10 +14,16 @@
  * Prefers the local node_modules/.bin binary over npx to skip
  * package-resolution overhead (~200-500ms savings per invocation).
  *
+ * Remembers the content hash of every file it has left clean in
+ * .claude/.cache/<formatter>-clean.json and skips the formatter entirely
+ * when an edit leaves a file byte-identical to a known-clean version.
+ *
  * Fails silently if no formatter is found or installed.
  */
 
 const { execFileSync, spawnSync } = require('node:child_process');
+const crypto = require('node:crypto');
+const fs = require('node:fs');
 const path = require('node:path');
 
 // Shell metacharacters that cmd.exe interprets as command separators/operators
@@ -26,6 +32,34 @@ const UNSAFE_PATH_CHARS = /[&|<>^%!]/;
 const { findProjectRoot, detectFormatter, resolveFormatterBin } = require('../lib/resolve-formatter');
 
 const MAX_STDIN = 1024 * 1024; // 1MB limit
+const CLEAN_CACHE_LIMIT = 5000;
+
+function hashFile(filePath) {
+  return crypto.createHash('sha1').update(fs.readFileSync(filePath)).digest('hex');
+}
+
+function readCleanCache(cachePath) {
+  try {
+    return JSON.parse(fs.readFileSync(cachePath, 'utf8'));
+  } catch {
+    return {};
+  }
+}
+
+/**
+ * Persist the clean-file cache, keeping only the most recently recorded
+ * entries. Written via rename so concurrent hooks never see a partial file.
+ */
+function writeCleanCache(cachePath, cache) {
+  const keys = Object.keys(cache);
+  for (const key of keys.slice(0, Math.max(0, keys.length - CLEAN_CACHE_LIMIT))) {
+    delete cache[key];
+  }
+  fs.mkdirSync(path.dirname(cachePath), { recursive: true });
+  const tmpPath = `${cachePath}.${process.pid}.tmp`;
+  fs.writeFileSync(tmpPath, JSON.stringify(cache));
+  fs.renameSync(tmpPath, cachePath);
+}
 
 /**
  * Core logic — exported so run-with-flags.js can call directly
@@ -48,6 +82,12 @@ function run(rawInput) {
           return rawInput;
         }
 
+        const cachePath = path.join(process.env.CLAUDE_PROJECT_DIR || projectRoot, '.claude', '.cache', `${formatter}-clean.json`);
+        const cleanCache = readCleanCache(cachePath);
+        if (cleanCache[resolvedFilePath] === hashFile(resolvedFilePath)) {
+          return rawInput;
+        }
+
         const resolved = resolveFormatterBin(projectRoot, formatter);
         if (!resolved) {
           return rawInput;
@@ -67,7 +107,7 @@ function run(rawInput) {
           const result = spawnSync(resolved.bin, args, {
             cwd: projectRoot,
             shell: true,
-            stdio: 'pipe',
+            stdio: ['ignore', 'ignore', 'pipe'],
             timeout: 15000,
           });
           if (result.error) {
@@ -77,12 +117,19 @@ function run(rawInput) {
             throw new Error(result.stderr?.toString() || `Formatter exited with status ${result.status}`);
           }
         } else {
+          // Output is never shown (failures are swallowed below), so don't
+          // buffer the formatter's stdout at all
           execFileSync(resolved.bin, args, {
             cwd: projectRoot,
-            stdio: ['pipe', 'pipe', 'pipe'],
+            stdio: ['ignore', 'ignore', 'pipe'],
             timeout: 15000,
           });
         }
+
+        // Record the post-format content; re-insert so the entry counts as newest
+        delete cleanCache[resolvedFilePath];
+        cleanCache[resolvedFilePath] = hashFile(resolvedFilePath);
+        writeCleanCache(cachePath, cleanCache);
       } catch {
         // Formatter not installed, file missing, or failed — non-blocking
       }
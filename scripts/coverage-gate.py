@@ -15,12 +15,34 @@ Design: each package is tested from its OWN directory, not from the workspace ro
 Running vitest from the root with multiple --project flags loads all project configs
 simultaneously via Promise.all(), triggering a non-deterministic ESM race condition
 with vite-tsconfig-paths. Per-package invocations load exactly one config each.
+
+The race does not trigger on every machine, so the first run probes a single
+batched root invocation. If it produces coverage, later runs keep batching;
+if it fails once, the outcome is recorded in .git/coverage-gate-batch-ok and
+every later run goes straight to per-package. Delete that file to re-probe.
 """
+import atexit
+import hashlib
 import json
 import os
 import re
+import signal
 import subprocess
 import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
+
+try:
+    import ijson  # optional: streams coverage JSON instead of loading it whole
+except ImportError:
+    ijson = None
+
+try:
+    import re2  # optional: google-re2, linear-time DFA matching for EXCLUDED_RE
+except ImportError:
+    re2 = None
 
 # --- Configuration ---
 COVERAGE_THRESHOLD = 80  # percent, applies to both lines and branches
@@ -82,6 +104,9 @@ EXCLUDED_PATTERNS = [
     r"/_components/mocks\.ts$",  # test mock data — not production code
 ]
 
+# All exclusions as one alternation, so each file is a single regex search
+EXCLUDED_RE = (re2 or re).compile("|".join(f"(?:{p})" for p in EXCLUDED_PATTERNS))
+
 # Maps repo-relative file prefix -> package subdirectory (relative to repo root).
 # Each package runs vitest from its own directory — one config loaded, no race.
 PROJECT_DIRS = [
@@ -123,71 +148,206 @@ PROJECT_DIRS = [
     ("packages/plugins/govee/", "packages/plugins/govee"),
 ]
 
+# Prefix lookup by directory: a file is matched by walking its parent dirs
+PROJECT_DIRS_BY_PREFIX = dict(PROJECT_DIRS)
+
 MAX_RETRIES = 2  # ESM race condition is non-deterministic; retry on failure
 
+# vitest writes its JSON report to a fresh temp dir per run, on tmpfs when
+# available, so reports never touch disk or a package's own coverage/ dir
+REPORTS_TMP_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+BATCH_STATE_FILE = "coverage-gate-batch-ok"  # under the git dir: "ok" or "fail"
+# Characters picomatch/tinyglobby treat as glob syntax; Next.js route groups
+# like (chat) and dynamic segments like [id] must match literally
+GLOB_SPECIAL_RE = re.compile(r"([\\()\[\]{}*?!+@|])")
+
+BARREL_CACHE_FILE = "coverage-gate-cache/barrels.json"  # under the git dir
+COVERAGE_CACHE_FILE = "coverage-gate-cache/coverage.json"  # under the git dir
+PROJECT_NAME_PATTERN = re.compile(r"\bname:\s*[\"']([^\"']+)[\"']")
+# The root vitest.config.ts `projects: [...]` list; a batched run only sees these
+ROOT_PROJECTS_PATTERN = re.compile(r"\bprojects:\s*\[([^\]]*)\]")
+QUOTED_STRING_PATTERN = re.compile(r"[\"']([^\"']+)[\"']")
+
+# Packages run concurrently; their vitest output is buffered and printed
+# one package at a time so it does not interleave
+_OUTPUT_LOCK = threading.Lock()
+
+# Coverage runs alongside the barrel check; a barrel failure aborts it by
+# killing every vitest process group still running
+_ABORTED = threading.Event()
+_ACTIVE_PROCS: set[subprocess.Popen] = set()
+_PROCS_LOCK = threading.Lock()
+
 # --- Barrel Detection ---
 
-# Matches lines that are purely re-exports
-RE_EXPORT_PATTERN = re.compile(
-    r"^\s*export\s+(?:\*|(?:type\s+)?\{[^}]*\})\s+from\s+[\"'][^\"']+[\"'];?\s*$"
+# Classifies each non-blank line in one pass over the whole file: a comment
+# (including a closing "*/"), a pure re-export, or anything else. Blank lines
+# produce no match. [^\S\n] is whitespace that cannot cross a line break.
+BARREL_LINE_PATTERN = re.compile(
+    r"^[^\S\n]*(?:"
+    r"(?P<comment>//|/\*|\*)"
+    r"|(?P<export>export[^\S\n]+(?:\*|(?:type[^\S\n]+)?\{[^}\n]*\})[^\S\n]+from[^\S\n]+[\"'][^\"'\n]+[\"'];?[^\S\n]*$)"
+    r"|(?P<other>\S))",
+    re.MULTILINE,
 )
-COMMENT_PATTERN = re.compile(r"^\s*(?://|/\*|\*)")
-EMPTY_PATTERN = re.compile(r"^\s*$")
+
+
+# Line starts that can never appear in a barrel; checked on the head of the
+# file with plain substring search before the full regex scan
+NON_BARREL_LINE_STARTS = ("import ", "function ", "class ", "const ", "export const ", "export function ")
+NON_BARREL_LINES = tuple(f"\n{start}" for start in NON_BARREL_LINE_STARTS)
+NON_BARREL_HEAD = 512
 
 
 def is_barrel(content: str) -> bool:
     """Check if file content is a pure barrel (only re-exports, no logic)."""
-    lines = content.split("\n")
+    head = content[:NON_BARREL_HEAD]
+    if head.startswith(NON_BARREL_LINE_STARTS) or any(line in head for line in NON_BARREL_LINES):
+        return False
+
     has_export = False
 
-    for line in lines:
-        if EMPTY_PATTERN.match(line) or COMMENT_PATTERN.match(line):
-            continue
-        if line.strip() == "*/":
-            continue
-        if RE_EXPORT_PATTERN.match(line):
+    for match in BARREL_LINE_PATTERN.finditer(content):
+        kind = match.lastgroup
+        if kind == "other":
+            return False
+        if kind == "export":
             has_export = True
-            continue
-        return False
 
     return has_export
 
 
-def get_staged_files(project_dir: str) -> list[str]:
-    """Get list of staged .ts/.tsx files."""
+def get_staged_blobs(project_dir: str) -> dict[str, str]:
+    """Map each staged .ts/.tsx file to the object id of its staged blob."""
+    # --raw gives the staged blob id alongside each path; NUL-delimited so
+    # paths arrive verbatim, including ones with whitespace
     result = subprocess.run(
-        ["git", "diff", "--cached", "--name-only", "--diff-filter=ACMR", "--", "*.ts", "*.tsx"],
+        ["git", "diff", "--cached", "--raw", "--no-abbrev", "-z", "--diff-filter=ACMR", "--", "*.ts", "*.tsx"],
+        capture_output=True,
+        cwd=project_dir,
+    )
+    if result.returncode != 0:
+        return {}
+
+    blobs: dict[str, str] = {}
+    fields = iter(result.stdout.split(b"\x00"))
+    for header in fields:
+        if not header.startswith(b":"):
+            continue
+        # :<old mode> <new mode> <old sha> <new sha> <status>, then the path;
+        # renames and copies are followed by both source and destination
+        _, _, _, sha, status = header.decode().split(" ")
+        path = next(fields)
+        if status[0] in "RC":
+            path = next(fields)
+        blobs[path.decode("utf-8", "replace")] = sha
+    return blobs
+
+
+def get_staged_changes(project_dir: str) -> list[str]:
+    """Every path the staged commit touches, any file type, deletions included."""
+    result = subprocess.run(
+        ["git", "diff", "--cached", "--name-only", "-z", "--no-renames"],
         capture_output=True,
-        text=True,
         cwd=project_dir,
     )
     if result.returncode != 0:
         return []
-    return [f.strip() for f in result.stdout.strip().split("\n") if f.strip()]
+    return [f.decode("utf-8", "replace") for f in result.stdout.split(b"\x00") if f]
 
 
-def check_barrels(staged_files: list[str], project_dir: str) -> list[str]:
-    """Check staged files for barrel patterns. Returns list of barrel file paths."""
-    barrels = []
-    for filepath in staged_files:
-        abs_path = os.path.join(project_dir, filepath)
-        if not os.path.isfile(abs_path):
+def read_blobs(project_dir: str, shas: list[str]) -> dict[str, bytes]:
+    """Read many blobs through one `git cat-file --batch` process."""
+    if not shas:
+        return {}
+    result = subprocess.run(
+        ["git", "cat-file", "--batch"],
+        input="".join(f"{sha}\n" for sha in shas).encode(),
+        capture_output=True,
+        cwd=project_dir,
+    )
+    if result.returncode != 0:
+        return {}
+
+    blobs: dict[str, bytes] = {}
+    out = result.stdout
+    pos = 0
+    while pos < len(out):
+        eol = out.index(b"\n", pos)
+        header = out[pos:eol].split(b" ")
+        pos = eol + 1
+        if len(header) != 3:  # "<sha> missing"
             continue
-        with open(abs_path, "r") as f:
-            content = f.read()
-        if is_barrel(content):
-            barrels.append(filepath)
-    return barrels
+        size = int(header[2])
+        blobs[header[0].decode()] = out[pos:pos + size]
+        pos += size + 1  # content is followed by a newline
+    return blobs
+
+
+def content_hash(raw: bytes) -> str:
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def load_cache(project_dir: str, name: str) -> dict:
+    """Load a persisted { repo-relative path: entry } cache and schedule it to be saved on exit."""
+    cache_path = _git_path(project_dir, name)
+    if cache_path is None:
+        return {}
+    try:
+        with open(cache_path, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    if not isinstance(cache, dict):
+        cache = {}
+    atexit.register(save_cache, cache, cache_path, project_dir)
+    return cache
+
+
+def save_cache(cache: dict, cache_path: str, project_dir: str) -> None:
+    """Atomically write a cache, dropping paths that no longer exist."""
+    for filepath in [p for p in cache if not os.path.isfile(os.path.join(project_dir, p))]:
+        del cache[filepath]
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def check_barrels(staged_blobs: dict[str, str], project_dir: str, cache: dict | None = None) -> list[str]:
+    """Check staged files for barrel patterns. Returns list of barrel file paths.
+
+    Reads the staged content, which is what gets committed, not the working
+    tree. Cache entries are { path: {"sha": blob id, "is_barrel": bool} }; a
+    file whose staged blob is unchanged is not read at all.
+    """
+    if cache is None:
+        cache = {}
+    misses = [f for f, sha in staged_blobs.items() if cache.get(f, {}).get("sha") != sha]
+
+    contents = read_blobs(project_dir, sorted({staged_blobs[f] for f in misses}))
+    for filepath in misses:
+        sha = staged_blobs[filepath]
+        raw = contents.get(sha)
+        if raw is not None:
+            cache[filepath] = {"sha": sha, "is_barrel": is_barrel(raw.decode("utf-8", "replace"))}
+
+    return [
+        f for f, sha in staged_blobs.items()
+        if cache.get(f, {}).get("sha") == sha and cache[f]["is_barrel"]
+    ]
 
 
 # --- Coverage Gate ---
 
 def is_excluded(filepath: str) -> bool:
     """Check if a file should be excluded from coverage checks."""
-    for pattern in EXCLUDED_PATTERNS:
-        if re.search(pattern, filepath):
-            return True
-    return False
+    return EXCLUDED_RE.search(filepath) is not None
 
 
 def get_testable_files(staged_files: list[str]) -> list[str]:
@@ -203,52 +363,175 @@ def group_files_by_package(testable_files: list[str]) -> dict[str, list[str]]:
     """
     groups: dict[str, list[str]] = {}
     for filepath in testable_files:
-        for prefix, pkg_subdir in PROJECT_DIRS:
-            if filepath.startswith(prefix):
-                relative = filepath[len(prefix):]
-                groups.setdefault(pkg_subdir, []).append(relative)
-                break
+        match = find_package_prefix(filepath)
+        if match is not None:
+            prefix, pkg_subdir = match
+            groups.setdefault(pkg_subdir, []).append(filepath[len(prefix):])
     return groups
 
 
-def run_coverage_for_package(pkg_subdir: str, files: list[str], repo_dir: str) -> dict | None:
+def find_package_prefix(filepath: str) -> tuple[str, str] | None:
+    """Return (prefix, pkg_subdir) of the deepest PROJECT_DIRS entry containing filepath."""
+    end = filepath.rfind("/")
+    while end != -1:
+        prefix = filepath[:end + 1]
+        pkg_subdir = PROJECT_DIRS_BY_PREFIX.get(prefix)
+        if pkg_subdir is not None:
+            return prefix, pkg_subdir
+        end = filepath.rfind("/", 0, end)
+    return None
+
+
+def load_coverage(coverage_path: str, wanted: set[str]) -> dict:
+    """Read an Istanbul coverage-final.json, keeping only the wanted absolute paths.
+
+    With ijson installed the file is streamed and records for other files are
+    never built; otherwise it falls back to json.load and filters afterwards.
+    """
+    with open(coverage_path, "rb") as f:
+        if ijson is not None:
+            return {path: record for path, record in ijson.kvitems(f, "", use_float=True) if path in wanted}
+        data = json.load(f)
+    return {path: data[path] for path in wanted if path in data}
+
+
+def try_load_coverage(coverage_path: str, wanted: set[str]) -> dict | None:
+    """load_coverage, or None if vitest did not write the report."""
+    try:
+        return load_coverage(coverage_path, wanted)
+    except FileNotFoundError:
+        return None
+
+
+def escape_glob(path: str) -> str:
+    """Escape a literal path for use as a vitest coverage include glob."""
+    return GLOB_SPECIAL_RE.sub(r"\\\1", path)
+
+
+def coverage_flags(files: list[str], reports_dir: str) -> list[str]:
+    """vitest flags that write a JSON report covering only the given files.
+
+    The report then holds just the staged files, so it stays small;
+    check_coverage applies the threshold to it.
+    """
+    return [
+        "--coverage",
+        "--coverage.reporter=json",
+        f"--coverage.reportsDirectory={reports_dir}",
+        # Without this a single failing test suppresses the report entirely
+        "--coverage.reportOnFailure=true",
+        *(f"--coverage.include={escape_glob(f)}" for f in files),
+    ]
+
+
+def _kill_group(proc: subprocess.Popen) -> None:
+    """Kill pnpm and the node processes it spawned."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def abort_coverage() -> None:
+    """Stop all running vitest processes and prevent new ones from starting."""
+    _ABORTED.set()
+    with _PROCS_LOCK:
+        for proc in _ACTIVE_PROCS:
+            _kill_group(proc)
+
+
+def _run_vitest(cmd: list[str], pkg_dir: str, output: list[str], timeout: int | None = None) -> int | None:
+    """Run a vitest command in pkg_dir, appending its captured output.
+
+    Returns the exit code, or None if the run timed out or was aborted.
+    """
+    with _PROCS_LOCK:
+        if _ABORTED.is_set():
+            return None
+        # Own process group, so a timeout or abort also kills the node children
+        proc = subprocess.Popen(
+            cmd,
+            cwd=pkg_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True,
+        )
+        _ACTIVE_PROCS.add(proc)
+    try:
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_group(proc)
+            stdout, stderr = proc.communicate()
+            output.append(f"{' '.join(cmd)} timed out after {timeout}s")
+            output.extend(stream for stream in (stdout, stderr) if stream)
+            return None
+    finally:
+        with _PROCS_LOCK:
+            _ACTIVE_PROCS.discard(proc)
+    output.extend(stream for stream in (stdout, stderr) if stream)
+    return None if _ABORTED.is_set() else proc.returncode
+
+
+def _flush_output(pkg_subdir: str, output: list[str]) -> None:
+    """Print one package's buffered vitest output as a single block."""
+    if not output:
+        return
+    with _OUTPUT_LOCK:
+        print(f"--- {pkg_subdir} ---")
+        for chunk in output:
+            print(chunk.rstrip("\n"))
+        sys.stdout.flush()
+
+
+def run_coverage_for_package(pkg_subdir: str, files: list[str], repo_dir: str, wanted: set[str]) -> dict | None:
     """Run vitest in a single package directory and return its coverage data.
 
     Runs from the package's own directory so only one vitest config is loaded.
     Tries 'vitest related' first, falls back to full suite with retries.
     """
-    pkg_dir = os.path.join(repo_dir, pkg_subdir)
-    coverage_path = os.path.join(pkg_dir, "coverage", "coverage-final.json")
+    output: list[str] = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="coverage-gate-", dir=REPORTS_TMP_ROOT) as reports_dir:
+            return _run_coverage_for_package(pkg_subdir, files, repo_dir, wanted, reports_dir, output)
+    finally:
+        _flush_output(pkg_subdir, output)
+
 
-    if os.path.isfile(coverage_path):
-        os.remove(coverage_path)
+def _run_coverage_for_package(
+    pkg_subdir: str, files: list[str], repo_dir: str, wanted: set[str], reports_dir: str, output: list[str]
+) -> dict | None:
+    pkg_dir = os.path.join(repo_dir, pkg_subdir)
+    coverage_path = os.path.join(reports_dir, "coverage-final.json")
 
     # Try vitest related first — only runs tests relevant to the changed files
-    subprocess.run(
-        ["pnpm", "vitest", "related", *files, "--run", "--coverage", "--coverage.reporter=json"],
-        cwd=pkg_dir,
+    _run_vitest(
+        ["pnpm", "vitest", "related", *files, "--run", *coverage_flags(files, reports_dir)],
+        pkg_dir,
+        output,
     )
 
-    if os.path.isfile(coverage_path):
-        with open(coverage_path, "r") as f:
-            return json.load(f)
+    data = try_load_coverage(coverage_path, wanted)
+    if data is not None:
+        return data
 
     # Fallback: full test suite with retries for sporadic ESM failures
     for attempt in range(1, MAX_RETRIES + 1):
+        if _ABORTED.is_set():
+            return None
         print(f"  [{pkg_subdir}] full suite (attempt {attempt}/{MAX_RETRIES})...", file=sys.stderr)
 
-        if os.path.isfile(coverage_path):
-            os.remove(coverage_path)
-
-        subprocess.run(
-            ["pnpm", "vitest", "--run", "--coverage", "--coverage.reporter=json"],
-            cwd=pkg_dir,
+        _run_vitest(
+            ["pnpm", "vitest", "--run", *coverage_flags(files, reports_dir)],
+            pkg_dir,
+            output,
             timeout=120,
         )
 
-        if os.path.isfile(coverage_path):
-            with open(coverage_path, "r") as f:
-                return json.load(f)
+        data = try_load_coverage(coverage_path, wanted)
+        if data is not None:
+            return data
 
         if attempt < MAX_RETRIES:
             print(f"  [{pkg_subdir}] retrying...", file=sys.stderr)
@@ -257,19 +540,291 @@ def run_coverage_for_package(pkg_subdir: str, files: list[str], repo_dir: str) -
     return None
 
 
-def run_coverage(testable_files: list[str], repo_dir: str) -> dict | None:
-    """Run coverage per-package and merge results."""
+def _git_path(repo_dir: str, name: str) -> str | None:
+    """Absolute path of a file inside the git dir (works in worktrees)."""
+    result = subprocess.run(
+        ["git", "rev-parse", "--path-format=absolute", "--git-path", name],
+        capture_output=True,
+        text=True,
+        cwd=repo_dir,
+    )
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
+def read_batch_state(repo_dir: str) -> str | None:
+    """Recorded outcome of the batched probe: "ok", "fail", or None if never probed."""
+    path = _git_path(repo_dir, BATCH_STATE_FILE)
+    if path is None:
+        return "fail"  # no git dir to remember the outcome in; stay per-package
+    try:
+        with open(path, "r") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def write_batch_state(repo_dir: str, state: str) -> None:
+    path = _git_path(repo_dir, BATCH_STATE_FILE)
+    if path is None:
+        return
+    try:
+        with open(path, "w") as f:
+            f.write(state + "\n")
+    except OSError:
+        pass
+
+
+def get_project_name(pkg_dir: str) -> str | None:
+    """The vitest project name (test.name) declared in a package's vitest config."""
+    try:
+        with open(os.path.join(pkg_dir, "vitest.config.ts"), "r") as f:
+            match = PROJECT_NAME_PATTERN.search(f.read())
+    except OSError:
+        return None
+    return match.group(1) if match else None
+
+
+def get_root_projects(repo_dir: str) -> set[str]:
+    """Package directories listed in the root vitest config's projects."""
+    try:
+        with open(os.path.join(repo_dir, "vitest.config.ts"), "r") as f:
+            match = ROOT_PROJECTS_PATTERN.search(f.read())
+    except OSError:
+        return set()
+    if not match:
+        return set()
+    return {entry.rstrip("/") for entry in QUOTED_STRING_PATTERN.findall(match.group(1))}
+
+
+def has_executed_statements(data: dict, filepaths: list[str]) -> bool:
+    """Whether any of the files has a record with at least one executed statement.
+
+    A file vitest never loaded is missing from the report, or listed with
+    every count at zero when the include list names it.
+    """
+    return any(any((data.get(path) or {}).get("s", {}).values()) for path in filepaths)
+
+
+def get_project_flags(groups: dict[str, list[str]], repo_dir: str) -> list[str] | None:
+    """--project flags for every grouped package, or None if a name can't be read."""
+    flags = []
+    for pkg_subdir in groups:
+        name = get_project_name(os.path.join(repo_dir, pkg_subdir))
+        if name is None:
+            return None
+        flags += ["--project", name]
+    return flags
+
+
+def run_coverage_batched(
+    groups: dict[str, list[str]], project_flags: list[str], repo_dir: str, wanted: set[str]
+) -> dict | None:
+    """Run all packages in one root vitest invocation with a --project flag each.
+
+    Returns None if the run leaves no coverage, so the caller can fall back
+    to per-package runs.
+    """
+    files = [f"{pkg_subdir}/{f}" for pkg_subdir, pkg_files in groups.items() for f in pkg_files]
+
+    output: list[str] = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="coverage-gate-", dir=REPORTS_TMP_ROOT) as reports_dir:
+            _run_vitest(
+                ["pnpm", "vitest", "related", *files, "--run", *coverage_flags(files, reports_dir), *project_flags],
+                repo_dir,
+                output,
+            )
+            # With reportOnFailure a failing test still writes a
+            # report; no report means the run itself broke (e.g. the ESM race)
+            return try_load_coverage(os.path.join(reports_dir, "coverage-final.json"), wanted)
+    finally:
+        _flush_output("batched", output)
+
+
+def package_config_key(pkg_dir: str) -> str:
+    """Fingerprint of the files that configure a package's test run."""
+    parts = []
+    for name in ("package.json", "vitest.config.ts"):
+        try:
+            parts.append(str(os.stat(os.path.join(pkg_dir, name)).st_mtime_ns))
+        except OSError:
+            parts.append("-")
+    return ":".join(parts)
+
+
+def use_cached_coverage(
+    groups: dict[str, list[str]], repo_dir: str, cache: dict, dirty_packages: set[str]
+) -> tuple[dict[str, list[str]], dict, dict[str, tuple[str, str]]]:
+    """Split out files whose passing coverage is cached and still valid.
+
+    A cached record is reused only when the file content and the package's
+    config are unchanged and no other file in the package (e.g. a test) is
+    staged. Returns (groups still to run, cached coverage records, and the
+    (sha, config key) of every file that still has to run).
+    """
+    repo_abs = os.path.abspath(repo_dir)
+    remaining: dict[str, list[str]] = {}
+    cached: dict = {}
+    fingerprints: dict[str, tuple[str, str]] = {}
+
+    for pkg_subdir, files in groups.items():
+        config = package_config_key(os.path.join(repo_dir, pkg_subdir))
+        for relative in files:
+            filepath = f"{pkg_subdir}/{relative}"
+            try:
+                with open(os.path.join(repo_dir, filepath), "rb") as f:
+                    sha = content_hash(f.read())
+            except OSError:
+                remaining.setdefault(pkg_subdir, []).append(relative)
+                continue
+            entry = cache.get(filepath)
+            if (
+                pkg_subdir not in dirty_packages
+                and entry
+                and entry.get("sha") == sha
+                and entry.get("config") == config
+            ):
+                cached[os.path.join(repo_abs, filepath)] = entry["record"]
+                continue
+            remaining.setdefault(pkg_subdir, []).append(relative)
+            fingerprints[filepath] = (sha, config)
+
+    return remaining, cached, fingerprints
+
+
+def store_passing_coverage(
+    coverage_data: dict, fingerprints: dict[str, tuple[str, str]], repo_dir: str, cache: dict
+) -> None:
+    """Remember coverage records of freshly run files that meet the threshold."""
+    repo_abs = os.path.abspath(repo_dir)
+    for filepath, (sha, config) in fingerprints.items():
+        record = coverage_data.get(os.path.join(repo_abs, filepath))
+        if record is None or check_coverage({os.path.join(repo_abs, filepath): record}, [filepath], repo_dir):
+            cache.pop(filepath, None)
+            continue
+        cache[filepath] = {"sha": sha, "config": config, "record": {"s": record.get("s", {}), "b": record.get("b", {})}}
+
+
+def run_coverage(
+    testable_files: list[str],
+    repo_dir: str,
+    cache: dict | None = None,
+    staged_changes: list[str] | None = None,
+) -> dict | None:
+    """Run coverage for all packages and merge results.
+
+    With a cache, files whose passing result is still valid are not rerun,
+    and packages left with no files launch no vitest at all.
+    """
     groups = group_files_by_package(testable_files)
     if not groups:
         return {}
 
-    merged: dict = {}
-    for pkg_subdir, files in groups.items():
-        print(f"  Checking {pkg_subdir} ({len(files)} file(s))...")
-        data = run_coverage_for_package(pkg_subdir, files, repo_dir)
-        if data is None:
+    cached: dict = {}
+    if cache is not None:
+        # Any other staged change in a package (a test edited or deleted, a
+        # fixture) can change the coverage of its sources, so those packages
+        # always rerun
+        testable = set(testable_files)
+        dirty_packages = set(group_files_by_package([f for f in staged_changes or [] if f not in testable]))
+        groups, cached, fingerprints = use_cached_coverage(groups, repo_dir, cache, dirty_packages)
+        if not groups:
+            print(f"  All {len(cached)} file(s) unchanged since their last passing run.")
+            return cached
+
+    data = _run_coverage_groups(groups, repo_dir)
+    if data is None:
+        return None
+    if cache is not None:
+        store_passing_coverage(data, fingerprints, repo_dir, cache)
+    data.update(cached)
+    return data
+
+
+def _run_coverage_groups(groups: dict[str, list[str]], repo_dir: str) -> dict | None:
+    """Run vitest for the grouped files and merge the coverage data.
+
+    With more than one package in the root vitest projects, tries a single
+    batched run for those first unless an earlier probe recorded that
+    batching fails here. Otherwise packages run concurrently, each its own
+    vitest process with its own config, so the ESM race described above
+    cannot occur; only the startup costs overlap.
+    """
+    # Coverage keys are absolute paths; only the staged files' records are kept
+    repo_abs = os.path.abspath(repo_dir)
+    wanted = {os.path.join(repo_abs, pkg_subdir, f) for pkg_subdir, files in groups.items() for f in files}
+
+    # The batched run goes through the root config, so only packages listed
+    # in its projects can be batched; the rest always run on their own
+    root_projects = get_root_projects(repo_dir) if len(groups) > 1 else set()
+    batchable = {pkg_subdir: files for pkg_subdir, files in groups.items() if pkg_subdir in root_projects}
+
+    # An unreadable project name only rules out batching for this run; it
+    # says nothing about the ESM race, so no outcome is recorded
+    project_flags = get_project_flags(batchable, repo_dir) if len(batchable) > 1 else None
+    if project_flags is None or read_batch_state(repo_dir) == "fail":
+        return _run_per_package(groups, repo_dir, wanted)
+
+    print(f"  Checking {len(batchable)} packages in one batched run...")
+    data = run_coverage_batched(batchable, project_flags, repo_dir, wanted)
+    if _ABORTED.is_set():
+        return None
+    if data is None:
+        write_batch_state(repo_dir, "fail")
+        print("  Batched run failed; falling back to per-package runs.", file=sys.stderr)
+        return _run_per_package(groups, repo_dir, wanted)
+
+    # A package whose files the batched run never loaded gets a run of its
+    # own; its files would otherwise fail as uncovered. Batching only counts
+    # as working when every package came back.
+    unloaded = [
+        pkg_subdir
+        for pkg_subdir, files in batchable.items()
+        if not has_executed_statements(data, [os.path.join(repo_abs, pkg_subdir, f) for f in files])
+    ]
+    if unloaded:
+        print(f"  Batched run left {len(unloaded)} package(s) without coverage; rerunning them.", file=sys.stderr)
+    else:
+        write_batch_state(repo_dir, "ok")
+
+    rerun = {
+        pkg_subdir: files
+        for pkg_subdir, files in groups.items()
+        if pkg_subdir not in batchable or pkg_subdir in unloaded
+    }
+    merged = {
+        path: record
+        for path, record in data.items()
+        if not any(path.startswith(os.path.join(repo_abs, pkg_subdir) + os.sep) for pkg_subdir in rerun)
+    }
+    if rerun:
+        rest = _run_per_package(rerun, repo_dir, wanted)
+        if rest is None:
             return None
-        merged.update(data)
+        merged.update(rest)
+    return merged
+
+
+def _run_per_package(groups: dict[str, list[str]], repo_dir: str, wanted: set[str]) -> dict | None:
+    """Run each package in its own vitest process, concurrently, and merge the coverage data."""
+    merged: dict = {}
+    workers = min(len(groups), os.cpu_count() or 4)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for pkg_subdir, files in groups.items():
+            print(f"  Checking {pkg_subdir} ({len(files)} file(s))...")
+            futures[executor.submit(run_coverage_for_package, pkg_subdir, files, repo_dir, wanted)] = pkg_subdir
+
+        for future in as_completed(futures):
+            data = future.result()
+            if data is None:
+                # The gate fails anyway; don't start packages still queued
+                for pending in futures:
+                    pending.cancel()
+                return None
+            merged.update(data)
 
     return merged
 
@@ -277,9 +832,10 @@ def run_coverage(testable_files: list[str], repo_dir: str) -> dict | None:
 def check_coverage(coverage_data: dict, testable_files: list[str], project_dir: str) -> list[dict]:
     """Check coverage thresholds for testable files. Returns list of failures."""
     failures = []
+    repo_abs = os.path.abspath(project_dir)
 
     for filepath in testable_files:
-        abs_path = os.path.abspath(os.path.join(project_dir, filepath))
+        abs_path = os.path.join(repo_abs, filepath)
 
         file_coverage = coverage_data.get(abs_path)
         if file_coverage is None:
@@ -292,14 +848,17 @@ def check_coverage(coverage_data: dict, testable_files: list[str], project_dir:
             })
             continue
 
+        # Hit counts are never negative, so covered = total - zeros; list.count
+        # does the counting in C instead of a Python-level generator
         stmt_map = file_coverage.get("s", {})
         total_stmts = len(stmt_map)
-        covered_stmts = sum(1 for v in stmt_map.values() if v > 0)
+        covered_stmts = total_stmts - list(stmt_map.values()).count(0)
         line_pct = (covered_stmts / total_stmts * 100) if total_stmts > 0 else 100
 
         branch_map = file_coverage.get("b", {})
-        total_branches = sum(len(v) for v in branch_map.values())
-        covered_branches = sum(1 for branches in branch_map.values() for v in branches if v > 0)
+        branch_counts = list(chain.from_iterable(branch_map.values()))
+        total_branches = len(branch_counts)
+        covered_branches = total_branches - branch_counts.count(0)
         branch_pct = (covered_branches / total_branches * 100) if total_branches > 0 else 100
 
         lines_ok = line_pct >= COVERAGE_THRESHOLD
@@ -323,14 +882,29 @@ def main() -> int:
     skip_coverage = "--skip-coverage" in sys.argv
     project_dir = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
 
-    staged_files = get_staged_files(project_dir)
+    staged_blobs = get_staged_blobs(project_dir)
+    staged_files = list(staged_blobs)
     if not staged_files:
         print("No staged .ts/.tsx files found. Skipping coverage gate.")
         return 0
 
+    # The checks are independent: start coverage (slow, mostly vitest startup)
+    # in the background while the barrel check runs
+    testable_files = [] if skip_coverage else get_testable_files(staged_files)
+    coverage_executor = ThreadPoolExecutor(max_workers=1)
+    coverage_future = None
+    if testable_files:
+        print(f"Running coverage check on {len(testable_files)} file(s)...")
+        coverage_future = coverage_executor.submit(
+            run_coverage, testable_files, project_dir, load_cache(project_dir, COVERAGE_CACHE_FILE),
+            get_staged_changes(project_dir),
+        )
+
     # --- Check 1: Barrel detection ---
-    barrels = check_barrels(staged_files, project_dir)
+    barrels = check_barrels(staged_blobs, project_dir, load_cache(project_dir, BARREL_CACHE_FILE))
     if barrels:
+        abort_coverage()
+        coverage_executor.shutdown(wait=True, cancel_futures=True)
         print("Barrel file detected (re-export only):\n", file=sys.stderr)
         for b in barrels:
             print(f"  {b}", file=sys.stderr)
@@ -343,13 +917,12 @@ def main() -> int:
         return 0
 
     # --- Check 2: Coverage gate ---
-    testable_files = get_testable_files(staged_files)
-    if not testable_files:
+    if coverage_future is None:
         print("No testable staged files after exclusions. Skipping coverage gate.")
         return 0
 
-    print(f"Running coverage check on {len(testable_files)} file(s)...")
-    coverage_data = run_coverage(testable_files, project_dir)
+    coverage_data = coverage_future.result()
+    coverage_executor.shutdown()
     if coverage_data is None:
         print("Could not generate coverage data. Failing as a precaution.", file=sys.stderr)
         return 1
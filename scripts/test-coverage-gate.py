@@ -39,6 +39,9 @@ def test_is_barrel():
     assert_eq("re-export with comments is barrel", is_barrel(
         '// Re-exports\nexport * from "./utils";\n'
     ), True)
+    assert_eq("re-export with block comment is barrel", is_barrel(
+        '/**\n * Re-exports\n */\nexport * from "./utils";\n'
+    ), True)
 
     # Files with real logic — should NOT be detected as barrels
     assert_eq("function is not barrel", is_barrel(
@@ -50,6 +53,12 @@ def test_is_barrel():
     assert_eq("import + logic is not barrel", is_barrel(
         'import { x } from "./y";\nexport const z = x + 1;\n'
     ), False)
+    assert_eq("re-exports then import is not barrel", is_barrel(
+        'export * from "./a";\nimport { x } from "./y";\n'
+    ), False)
+    assert_eq("multi-line export is not barrel", is_barrel(
+        'export {\n  foo,\n} from "./bar";\n'
+    ), False)
     assert_eq("empty file is not barrel", is_barrel(""), False)
     assert_eq("only comments is not barrel", is_barrel("// just a comment\n"), False)
 
@@ -130,6 +139,145 @@ def test_check_coverage():
     failures = check_coverage(no_branches, ["src/simple.ts"], project_dir)
     assert_eq("no branches defaults to 100%", len(failures), 0)
 
+    # Route groups and dynamic segments must be matched literally by vitest
+    assert_eq("glob metacharacters escaped", mod.escape_glob("src/app/(chat)/[id]/x.ts"),
+              "src/app/\\(chat\\)/\\[id\\]/x.ts")
+    flags = mod.coverage_flags(["src/a.ts"], "/tmp/reports")
+    assert_eq("report kept on test failure", "--coverage.reportOnFailure=true" in flags, True)
+
+
+def test_load_coverage():
+    """Test that only the requested files are kept from a coverage report."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import importlib
+    import json
+    import tempfile
+    mod = importlib.import_module("coverage-gate")
+
+    report = {
+        "/repo/src/a.ts": {"s": {"0": 1}, "b": {}},
+        "/repo/src/b.ts": {"s": {"0": 0}, "b": {}},
+    }
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(report, f)
+    try:
+        data = mod.load_coverage(f.name, {"/repo/src/a.ts", "/repo/src/missing.ts"})
+    finally:
+        os.remove(f.name)
+    assert_eq("only wanted files loaded", data, {"/repo/src/a.ts": {"s": {"0": 1}, "b": {}}})
+
+
+def test_group_files_by_package():
+    """Test mapping staged files to their package directories."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import importlib
+    mod = importlib.import_module("coverage-gate")
+    group_files_by_package = mod.group_files_by_package
+
+    groups = group_files_by_package([
+        "apps/web/src/app/_helpers/foo.ts",
+        "packages/plugins/outlook/src/a.ts",
+        "packages/plugins/outlook-calendar/src/b.ts",
+        "apps/web/src/bar.ts",
+        "unknown/src/baz.ts",
+    ])
+    assert_eq("files grouped by package", groups, {
+        "apps/web": ["src/app/_helpers/foo.ts", "src/bar.ts"],
+        "packages/plugins/outlook": ["src/a.ts"],
+        "packages/plugins/outlook-calendar": ["src/b.ts"],
+    })
+
+
+def test_batchable_packages():
+    """Test reading the root vitest projects and spotting packages a batch never loaded."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import importlib
+    import tempfile
+    mod = importlib.import_module("coverage-gate")
+
+    with tempfile.TemporaryDirectory() as repo_dir:
+        assert_eq("no root config batches nothing", mod.get_root_projects(repo_dir), set())
+        with open(os.path.join(repo_dir, "vitest.config.ts"), "w") as f:
+            f.write("export default defineConfig({\n  test: {\n    projects: [\n"
+                    "      'apps/web',\n      \"packages/ui/\",\n    ],\n  },\n});\n")
+        assert_eq("root projects read", mod.get_root_projects(repo_dir), {"apps/web", "packages/ui"})
+
+    data = {"/repo/a.ts": {"s": {"0": 0, "1": 2}}, "/repo/b.ts": {"s": {"0": 0}}}
+    assert_eq("executed statement counts as loaded", mod.has_executed_statements(data, ["/repo/a.ts"]), True)
+    assert_eq("all-zero record counts as unloaded", mod.has_executed_statements(data, ["/repo/b.ts"]), False)
+    assert_eq("missing record counts as unloaded", mod.has_executed_statements(data, ["/repo/c.ts"]), False)
+
+
+def test_use_cached_coverage():
+    """Test that cached passing coverage is reused only while still valid."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import importlib
+    import tempfile
+    mod = importlib.import_module("coverage-gate")
+
+    with tempfile.TemporaryDirectory() as repo_dir:
+        os.makedirs(os.path.join(repo_dir, "packages/logger/src"))
+        with open(os.path.join(repo_dir, "packages/logger/src/a.ts"), "w") as f:
+            f.write("export const a = 1;\n")
+        groups = {"packages/logger": ["src/a.ts"]}
+        record = {"s": {"0": 1}, "b": {}}
+
+        cache = {}
+        remaining, cached, fingerprints = mod.use_cached_coverage(groups, repo_dir, cache, set())
+        assert_eq("empty cache runs everything", remaining, groups)
+        mod.store_passing_coverage(
+            {os.path.join(repo_dir, "packages/logger/src/a.ts"): record}, fingerprints, repo_dir, cache
+        )
+
+        remaining, cached, _ = mod.use_cached_coverage(groups, repo_dir, cache, set())
+        assert_eq("unchanged file skips vitest", remaining, {})
+        assert_eq("cached record returned", list(cached.values()), [record])
+
+        remaining, _, _ = mod.use_cached_coverage(groups, repo_dir, cache, {"packages/logger"})
+        assert_eq("staged test file forces rerun", remaining, groups)
+
+        with open(os.path.join(repo_dir, "packages/logger/src/a.ts"), "w") as f:
+            f.write("export const a = 2;\n")
+        remaining, _, _ = mod.use_cached_coverage(groups, repo_dir, cache, set())
+        assert_eq("changed file reruns", remaining, groups)
+
+
+def test_check_barrels_cache():
+    """Test that barrels are detected from staged blobs and cached by blob id."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import importlib
+    import subprocess
+    import tempfile
+    mod = importlib.import_module("coverage-gate")
+
+    with tempfile.TemporaryDirectory() as project_dir:
+        subprocess.run(["git", "init", "-q"], cwd=project_dir, check=True)
+        os.makedirs(os.path.join(project_dir, "src dir"))
+        with open(os.path.join(project_dir, "src dir/index.ts"), "w") as f:
+            f.write('export * from "./a";\n')
+        with open(os.path.join(project_dir, "logic.ts"), "w") as f:
+            f.write("export const foo = 42;\n")
+        subprocess.run(["git", "add", "."], cwd=project_dir, check=True)
+
+        # Working tree changes after staging do not affect the check
+        with open(os.path.join(project_dir, "src dir/index.ts"), "w") as f:
+            f.write("export const bar = 1;\n")
+
+        staged = mod.get_staged_blobs(project_dir)
+        assert_eq("staged paths listed", sorted(staged), ["logic.ts", "src dir/index.ts"])
+
+        cache = {}
+        assert_eq("staged barrel detected", mod.check_barrels(staged, project_dir, cache), ["src dir/index.ts"])
+        assert_eq("result cached by blob id", cache["src dir/index.ts"]["sha"], staged["src dir/index.ts"])
+
+        # A cached entry for the same blob is trusted without reading it
+        cache["src dir/index.ts"]["is_barrel"] = False
+        assert_eq("unchanged blob uses cache", mod.check_barrels(staged, project_dir, cache), [])
+
+        # A different blob id is read and rescanned
+        cache["src dir/index.ts"]["sha"] = "0" * 40
+        assert_eq("changed blob is rescanned", mod.check_barrels(staged, project_dir, cache), ["src dir/index.ts"])
+
 
 if __name__ == "__main__":
     print("Running barrel detection tests...")
@@ -138,5 +286,15 @@ if __name__ == "__main__":
     test_is_excluded()
     print("\nRunning coverage check tests...")
     test_check_coverage()
+    print("\nRunning coverage loading tests...")
+    test_load_coverage()
+    print("\nRunning package grouping tests...")
+    test_group_files_by_package()
+    print("\nRunning batching tests...")
+    test_batchable_packages()
+    print("\nRunning coverage cache tests...")
+    test_use_cached_coverage()
+    print("\nRunning barrel cache tests...")
+    test_check_barrels_cache()
     print(f"\nResults: {PASS_COUNT} passed, {FAIL_COUNT} failed")
     sys.exit(1 if FAIL_COUNT > 0 else 0)